@@ -17,7 +17,18 @@ import shutil
 import json
 from google.oauth2.credentials import Credentials
 import urllib.request
-from github import Github  # Requires PyGithub: pip install PyGithub
+import urllib.parse
+import io
+import hashlib
+import zlib
+import threading
+import numpy as np
+import tempfile
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from github import Github, UnknownObjectException  # Requires PyGithub: pip install PyGithub
+from export_results import EXPORT_FORMATS, EXPORT_MIME_TYPES, export_results, write_resume_zip
 
 # Streamlit page config
 st.set_page_config(page_title="AI Recruitment", layout="wide")
@@ -39,6 +50,13 @@ GITHUB_REPO = "Abdullah922-hash/Recruitement"
 GITHUB_DB_PATH = "recruitment.db"
 GITHUB_RESUME_PATH = "Resumes"
 GITHUB_JD_PATH = "JDs"
+BLOB_FOLDER = "ResumeBlobs"  # Content-addressed resume store, mirrored at the same path on GitHub
+BLOB_INDEX_FILE = os.path.join(BLOB_FOLDER, "index.tsv")  # blob_hash, blob_path, original_name, folder
+BLOB_UPLOADED_FILE = os.path.join(BLOB_FOLDER, "uploaded.txt")  # Hashes confirmed on GitHub
+BLOB_CACHE_DIR = "/tmp/resume_cache"  # Local cache for resumes fetched from GitHub
+BLOB_CACHE_MAX_BYTES = 200 * 1024 * 1024
+MATCH_VECTOR_DIM = 4096  # Hashed term-vector size used for cross-job matching
+MATCH_VECTOR_FILE = "match_vectors.npz"  # Kept beside ResumeBlobs/, out of the GitHub-synced database
 
 load_dotenv()
 
@@ -51,11 +69,20 @@ def github_setup():
         return repo
     return None
 
+def github_put_file(repo, github_path, content, commit_message="Update file"):
+    # create_file fails with 422 once the path exists, so existing files are updated in place
+    try:
+        existing = repo.get_contents(github_path, ref="main")
+    except UnknownObjectException:
+        repo.create_file(github_path, commit_message, content, branch="main")
+    else:
+        repo.update_file(github_path, commit_message, content, existing.sha, branch="main")
+
 def github_upload_file(repo, file_path, github_path, commit_message="Update file"):
     try:
         with open(file_path, "rb") as file:
             content = file.read()
-        repo.create_file(github_path, commit_message, content, branch="main")
+        github_put_file(repo, github_path, content, commit_message)
     except Exception as e:
         st.warning(f"Failed to upload {file_path} to GitHub: {e}")
 
@@ -67,6 +94,291 @@ def github_download_file(repo, github_path, local_path):
     except Exception as e:
         st.warning(f"Failed to download {github_path} from GitHub: {e}")
 
+# Shared worker pool for disk/GitHub writes that shouldn't block scoring
+@st.cache_resource
+def background_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+def persist_upload(data, local_path, repo=None, github_path=None, exists_ok=False):
+    # Runs off the script thread, so report failures with print instead of st.*
+    # Returns True once the file is on GitHub
+    try:
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        with open(local_path, "wb") as f:
+            f.write(data)
+        if repo and github_path:
+            repo.create_file(github_path, "Update file", bytes(data), branch="main")
+            return True
+    except Exception as e:
+        # 422 means the path already exists on GitHub; only content-addressed paths can treat that as done
+        if exists_ok and getattr(e, "status", None) == 422:
+            return True
+        print(f"Failed to persist {local_path}: {e}")
+    return False
+
+def persist_upload_async(data, local_path, repo=None, github_path=None):
+    return background_executor().submit(persist_upload, data, local_path, repo, github_path)
+
+# Database uploads run in the background with at most one in flight; a write made meanwhile replaces
+# the queued snapshot instead of adding another GitHub commit
+@st.cache_resource
+def database_upload_state():
+    return {"lock": threading.Lock(), "pending": None, "future": None}
+
+def drain_database_uploads(state, repo):
+    while True:
+        with state["lock"]:
+            data, state["pending"] = state["pending"], None
+            if data is None:
+                state["future"] = None
+                return
+        try:
+            github_put_file(repo, GITHUB_DB_PATH, data, "Update database")
+        except Exception as e:
+            print(f"Failed to upload {DATABASE} to GitHub: {e}")
+
+def upload_database():
+    # init_db replaces the local copy from GitHub on every rerun, so a write only lasts once uploaded
+    repo = github_setup()
+    if not repo:
+        return
+    with open(DATABASE, "rb") as f:
+        data = f.read()
+    state = database_upload_state()
+    with state["lock"]:
+        state["pending"] = data
+        if state["future"] is None:
+            state["future"] = background_executor().submit(drain_database_uploads, state, repo)
+
+def wait_for_database_upload():
+    # Called before init_db downloads over the local copy, so writes still queued aren't lost
+    future = database_upload_state()["future"]
+    if future:
+        future.result()
+
+# Resume blob store: files are keyed by SHA-256 so identical names never overwrite each other.
+# The name/folder index lives next to the blobs rather than in the database, which init_db
+# replaces from GitHub on every rerun, and is synced to GitHub with them.
+@st.cache_resource
+def blob_index_lock():
+    # Re-entrant so sync_blob_index can merge and upload under the same lock
+    return threading.RLock()
+
+def resume_blob_path(data, original_name):
+    digest = hashlib.sha256(data).hexdigest()
+    ext = os.path.splitext(original_name)[1].lower()
+    return digest, os.path.join(BLOB_FOLDER, digest[:2], digest[2:4], digest + ext)
+
+def parse_blob_index(lines):
+    return [line.rstrip("\r\n").split("\t") for line in lines if line.count("\t") == 3]
+
+def read_blob_index_file():
+    if not os.path.exists(BLOB_INDEX_FILE):
+        return []
+    with open(BLOB_INDEX_FILE, "r", encoding="utf-8") as f:
+        return parse_blob_index(f)
+
+def merge_remote_blob_index(repo=None):
+    # Adds entries from the GitHub copy that are missing locally; returns False if it couldn't be read
+    github_path = BLOB_INDEX_FILE.replace(os.sep, "/")
+    try:
+        if repo:
+            data = repo.get_contents(github_path, ref="main").decoded_content
+        else:
+            url = f"https://raw.githubusercontent.com/{GITHUB_REPO}/main/{urllib.parse.quote(github_path)}"
+            with urllib.request.urlopen(url) as response:
+                data = response.read()
+    except Exception as e:
+        # 404 just means nothing has been synced yet
+        if getattr(e, "status", getattr(e, "code", None)) == 404:
+            return True
+        print(f"Failed to fetch {github_path} from GitHub: {e}")
+        return False
+    with blob_index_lock():
+        local = read_blob_index_file()
+        missing = [entry for entry in parse_blob_index(data.decode("utf-8").splitlines()) if entry not in local]
+        if missing:
+            os.makedirs(BLOB_FOLDER, exist_ok=True)
+            with open(BLOB_INDEX_FILE, "a", encoding="utf-8") as f:
+                f.writelines("\t".join(entry) + "\n" for entry in missing)
+    return True
+
+@st.cache_resource
+def restore_blob_index():
+    # Once per server process: a restart on an ephemeral filesystem starts without ResumeBlobs/
+    return merge_remote_blob_index(github_setup())
+
+def sync_blob_index(repo):
+    # Runs from background threads too, so failures are reported with print and the return value
+    with blob_index_lock():
+        try:
+            if not merge_remote_blob_index(repo):
+                return False
+            with open(BLOB_INDEX_FILE, "rb") as f:
+                github_put_file(repo, BLOB_INDEX_FILE.replace(os.sep, "/"), f.read(), "Update resume index")
+            return True
+        except Exception as e:
+            print(f"Failed to sync {BLOB_INDEX_FILE} to GitHub: {e}")
+            return False
+
+def read_blob_index():
+    restore_blob_index()
+    return read_blob_index_file()
+
+def read_uploaded_blobs():
+    if not os.path.exists(BLOB_UPLOADED_FILE):
+        return set()
+    with open(BLOB_UPLOADED_FILE, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+def append_blob_record(path, line):
+    with blob_index_lock():
+        os.makedirs(BLOB_FOLDER, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+def persist_blob(data, blob_path, digest, repo=None):
+    github_path = blob_path.replace(os.sep, "/") if repo else None
+    # Only record the blob as uploaded once GitHub has it, so a failed upload is retried next time
+    if persist_upload(data, blob_path, repo, github_path, exists_ok=True):
+        append_blob_record(BLOB_UPLOADED_FILE, digest)
+
+def store_resume_blob(data, original_name, folder="", repo=None, background=False):
+    digest, blob_path = resume_blob_path(data, original_name)
+    entry = [digest, blob_path, re.sub(r'[\t\r\n]+', ' ', original_name), folder]
+    if entry not in read_blob_index():
+        append_blob_record(BLOB_INDEX_FILE, "\t".join(entry))
+    needs_upload = repo is not None and digest not in read_uploaded_blobs()
+    if needs_upload or not os.path.exists(blob_path):
+        args = (data, blob_path, digest, repo if needs_upload else None)
+        if background:
+            background_executor().submit(persist_blob, *args)
+        else:
+            persist_blob(*args)
+    return blob_path
+
+def list_folder_resumes(folder):
+    paths = list(dict.fromkeys(blob_path for _, blob_path, _, entry_folder in read_blob_index()
+                               if entry_folder == folder))
+    # Resumes saved before the blob store existed still live under Resumes/<folder>
+    legacy_folder = os.path.join(RESUME_FOLDER, folder)
+    if os.path.isdir(legacy_folder):
+        paths += [os.path.join(legacy_folder, f) for f in sorted(os.listdir(legacy_folder))
+                  if os.path.isfile(os.path.join(legacy_folder, f))]
+    return paths
+
+def resume_original_name(resume_path):
+    for _, blob_path, original_name, _ in read_blob_index():
+        if blob_path == resume_path:
+            return original_name
+    return os.path.basename(resume_path)
+
+def evict_resume_cache(max_bytes=BLOB_CACHE_MAX_BYTES):
+    # Other sessions may evict concurrently, so files can vanish between listing and removal
+    entries = []
+    for root, _, files in os.walk(BLOB_CACHE_DIR):
+        for filename in files:
+            path = os.path.join(root, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    # Oldest access first; hits refresh mtime so this behaves as an LRU
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+def resume_cache_path(resume_path):
+    # Flattened so nested or Windows-style paths from the database map to one safe file name
+    return os.path.join(BLOB_CACHE_DIR, re.sub(r'[^\w.-]+', '_', resume_path))
+
+def resume_repo_paths(resume_path):
+    # Repo-relative candidates, tried against the local checkout and then GitHub
+    parts = [part for part in re.split(r'[\\/]+', resume_path) if part]
+    paths = []
+    if not os.path.isabs(resume_path) and not re.match(r'^[A-Za-z]:', resume_path):
+        paths.append("/".join(parts))
+    if RESUME_FOLDER in parts[:-1]:
+        # Older rows hold absolute paths such as C:\...\Resumes\<folder>\<file>; the repo keeps the
+        # part from Resumes onward, and some Gmail resumes were uploaded flat as Resumes/<file>
+        start = max(i for i, part in enumerate(parts[:-1]) if part == RESUME_FOLDER)
+        for path in ("/".join([GITHUB_RESUME_PATH] + parts[start + 1:]), f"{GITHUB_RESUME_PATH}/{parts[-1]}"):
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+def local_resume_file(resume_path):
+    # Local file or cache hit only; never goes to the network
+    if not resume_path:
+        return None
+    if os.path.exists(resume_path):
+        return resume_path
+    for repo_path in resume_repo_paths(resume_path):
+        if os.path.isfile(repo_path):
+            return repo_path
+    cache_path = resume_cache_path(resume_path)
+    try:
+        os.utime(cache_path)
+        return cache_path
+    except OSError:
+        return None
+
+def fetch_resume_file(resume_path):
+    # Returns a readable local path, pulling the file from GitHub on first access if needed
+    local_path = local_resume_file(resume_path)
+    if local_path or not resume_path:
+        return local_path
+    repo = github_setup()
+    for github_path in resume_repo_paths(resume_path):
+        try:
+            if repo:
+                data = repo.get_contents(github_path).decoded_content
+            else:
+                url = f"https://raw.githubusercontent.com/{GITHUB_REPO}/main/{urllib.parse.quote(github_path)}"
+                with urllib.request.urlopen(url) as response:
+                    data = response.read()
+        except Exception as e:
+            print(f"Failed to fetch {github_path} from GitHub: {e}")
+            continue
+        cache_path = resume_cache_path(resume_path)
+        try:
+            os.makedirs(BLOB_CACHE_DIR, exist_ok=True)
+            with open(cache_path, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Failed to cache {github_path}: {e}")
+            return None
+        evict_resume_cache()
+        return cache_path
+    return None
+
+def resume_download_button(resume_path, key):
+    # Remote resumes are downloaded when a recruiter asks for one, not for every rendered report
+    local_resume = local_resume_file(resume_path)
+    if not local_resume and resume_path and st.button("Fetch Resume", key=f"fetch_{key}"):
+        with st.spinner("Fetching resume..."):
+            local_resume = fetch_resume_file(resume_path)
+        if not local_resume:
+            st.error("Resume file could not be fetched.")
+    if local_resume:
+        with open(local_resume, "rb") as file:
+            st.download_button(
+                label="📄 Download Resume",
+                data=file,
+                file_name=resume_original_name(resume_path),
+                mime="application/octet-stream",
+                key=key
+            )
+    elif not resume_path:
+        st.error("Resume file not found or path missing in database.")
+
 def authenticate_gmail():
     try:
         oauth_credentials = {
@@ -99,8 +411,8 @@ def search_emails(service, subject_text="", after_date="", before_date=""):
     results = service.users().messages().list(userId='me', q=query).execute()
     return results.get('messages', [])
 
-def download_attachments(service, messages, destination_folder=RESUME_FOLDER):
-    os.makedirs(destination_folder, exist_ok=True)
+def download_attachments(service, messages, folder=""):
+    repo = github_setup()
     downloaded = 0
     for message in messages:
         try:
@@ -112,17 +424,12 @@ def download_attachments(service, messages, destination_folder=RESUME_FOLDER):
                         userId='me', messageId=message['id'], id=attachment_id
                     ).execute()
                     file_data = base64.urlsafe_b64decode(attachment['data'].encode('UTF-8'))
-                    attachment_filename = part['filename']
-                    attachment_path = os.path.join(destination_folder, attachment_filename)
-                    with open(attachment_path, 'wb') as f:
-                        f.write(file_data)
-                    # Optional: Upload to GitHub
-                    repo = github_setup()
-                    if repo:
-                        github_upload_file(repo, attachment_path, f"{GITHUB_RESUME_PATH}/{attachment_filename}")
+                    store_resume_blob(file_data, part['filename'], folder=folder, repo=repo)
                     downloaded += 1
         except Exception:
             continue
+    if repo and downloaded and not sync_blob_index(repo):
+        st.warning("Failed to upload the resume index to GitHub; these resumes won't be listed after a restart.")
     return downloaded
 
 # Resume Extraction
@@ -150,13 +457,15 @@ def extract_job_title_from_filename(jd_path):
         return filename.split("for", 1)[-1].replace('.docx', '').replace('.doc', '').replace('.pdf', '').strip()
     return "Not found"
 
-def extract_resume_info(file_path):
+def extract_resume_info(file_path, stream=None):
+    # `stream` lets callers pass an in-memory buffer (e.g. BytesIO) instead of reading file_path
     ext = os.path.splitext(file_path)[1].lower()
+    source = stream if stream is not None else file_path
     try:
         if ext == '.pdf':
-            text = extract_pdf_text(file_path)
+            text = extract_pdf_text(source)
         elif ext == '.docx':
-            text = extract_text_from_docx(file_path)
+            text = extract_text_from_docx(source)
         else:
             raise ValueError("Unsupported file type. Only PDF and DOCX are supported.")
         info = extract_info_from_text(text)
@@ -166,11 +475,58 @@ def extract_resume_info(file_path):
     except Exception:
         return None
 
-def analyze_resume_with_gpt(resume_info, job_description):
-    openai.api_key = st.secrets["openai"]["OPENAI_API_KEY"]
-    if not openai.api_key:
-        st.error("OpenAI API key not found.")
-        return "Score: 0\nRecommendation: Analysis failed due to missing API key\nStrengths: None\nGaps: None"
+def read_job_description(jd_path):
+    ext = os.path.splitext(jd_path)[1].lower()
+    if ext == '.txt':
+        with open(jd_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    elif ext == '.docx':
+        return extract_text_from_docx(jd_path)
+    elif ext == '.pdf':
+        return extract_pdf_text(jd_path)
+    return None
+
+def parse_analysis_result(result):
+    score = 0
+    strengths = ""
+    recommendation = ""
+    gaps = ""
+    for line in result.splitlines():
+        # Route on the label before the colon only; values can contain words like "scores" or "gap"
+        label, sep, value = line.strip().lstrip("-*• ").partition(":")
+        if not sep:
+            continue
+        label = label.strip("* ").lower()
+        value = value.strip("* ")
+        if label.startswith("score"):
+            match = re.match(r'(\d+\.?\d*)', value)
+            if match:
+                score = float(match.group(1))
+        elif label.startswith("strength"):
+            strengths = value
+        elif label.startswith("recommendation"):
+            recommendation = value
+        elif label.startswith("gap"):
+            gaps = value
+    return score, strengths, recommendation, gaps
+
+# Scoring backends: each takes (resume_info, job_description) and returns the
+# "Score / Recommendation / Strengths / Gaps" text that parse_analysis_result reads
+SCORING_SYSTEM_MESSAGE = "You are an expert HR recruiter analyzing resumes."
+SKILL_KEYWORDS = {
+    "python", "java", "javascript", "typescript", "c++", "c#", "sql", "nosql", "scala", "go", "rust",
+    "react", "angular", "node", "django", "flask", "spring", "aws", "azure", "gcp", "docker", "kubernetes",
+    "linux", "git", "pandas", "numpy", "tensorflow", "pytorch", "keras", "spark", "hadoop", "tableau",
+    "excel", "statistics", "ml", "nlp", "mongodb", "postgresql", "mysql", "html", "css", "rest", "api"
+}
+# Generic job-ad wording that says nothing about fit
+JD_FILLER_TERMS = {
+    "requirements", "required", "requirement", "responsibilities", "preferred", "strong", "good", "excellent",
+    "experience", "knowledge", "skills", "ability", "work", "working", "team", "years", "role", "candidate",
+    "background", "plus", "including", "etc", "must", "should", "can", "about", "job", "position", "company"
+}
+
+def build_analysis_prompt(resume_info, job_description):
     resume_text = resume_info.get('text', '')
     if not resume_text:
         resume_text = f"Name: {resume_info.get('name', 'Not found')}\nEmail: {resume_info.get('email', 'Not found')}\nMobile: {resume_info.get('mobile', 'Not found')}"
@@ -197,11 +553,19 @@ Instructions:
 
 Ensure the score reflects the actual fit, avoiding inflated ratings unless fully justified.
 """
+    return prompt
+
+def analyze_resume_with_gpt(resume_info, job_description):
+    openai.api_key = st.secrets["openai"]["OPENAI_API_KEY"]
+    if not openai.api_key:
+        st.error("OpenAI API key not found.")
+        return "Score: 0\nRecommendation: Analysis failed due to missing API key\nStrengths: None\nGaps: None"
+    prompt = build_analysis_prompt(resume_info, job_description)
     try:
         response = openai.ChatCompletion.create(
             model="gpt-4" if os.getenv("USE_GPT4", "0") == "1" else "gpt-3.5-turbo",
             messages=[
-                {"role": "system", "content": "You are an expert HR recruiter analyzing resumes."},
+                {"role": "system", "content": SCORING_SYSTEM_MESSAGE},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
@@ -212,7 +576,84 @@ Ensure the score reflects the actual fit, avoiding inflated ratings unless fully
         st.error(f"GPT analysis failed: {str(e)}")
         return f"Score: 0\nRecommendation: Analysis failed due to {str(e)}\nStrengths: None\nGaps: None"
 
+def analyze_resume_with_endpoint(resume_info, job_description):
+    # Any server exposing the OpenAI /chat/completions API, e.g. a locally hosted model
+    endpoint = st.secrets.get("scoring_endpoint", {})
+    base_url = endpoint.get("url", os.getenv("SCORING_ENDPOINT_URL", ""))
+    if not base_url:
+        st.error("Scoring endpoint URL not found.")
+        return "Score: 0\nRecommendation: Analysis failed due to missing endpoint URL\nStrengths: None\nGaps: None"
+    payload = {
+        "model": endpoint.get("model", os.getenv("SCORING_ENDPOINT_MODEL", "local-model")),
+        "messages": [
+            {"role": "system", "content": SCORING_SYSTEM_MESSAGE},
+            {"role": "user", "content": build_analysis_prompt(resume_info, job_description)}
+        ],
+        "temperature": 0.3,
+        "max_tokens": 500
+    }
+    headers = {"Content-Type": "application/json"}
+    api_key = endpoint.get("api_key", os.getenv("SCORING_ENDPOINT_API_KEY", ""))
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    request = urllib.request.Request(
+        f"{base_url.rstrip('/')}/chat/completions",
+        data=json.dumps(payload).encode("utf-8"),
+        headers=headers
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            body = json.loads(response.read().decode("utf-8"))
+        return body['choices'][0]['message']['content'].strip()
+    except Exception as e:
+        st.error(f"Endpoint analysis failed: {str(e)}")
+        return f"Score: 0\nRecommendation: Analysis failed due to {str(e)}\nStrengths: None\nGaps: None"
+
+def analyze_resume_with_heuristic(resume_info, job_description):
+    # Deterministic, CPU-only: weighted coverage of the JD's key terms, with known skills counted double
+    jd_counts = Counter(
+        t for t in tokenize(job_description or "")
+        if t not in JD_FILLER_TERMS and (len(t) > 2 or t in SKILL_KEYWORDS)
+    )
+    weights = {t: count * (2 if t in SKILL_KEYWORDS else 1) for t, count in jd_counts.items()}
+    key_terms = sorted(weights, key=lambda t: (-weights[t], t))[:40]
+    if not key_terms:
+        return "Score: 0\nRecommendation: Job description has no usable keywords\nStrengths: None\nGaps: None"
+    resume_terms = set(tokenize(resume_info.get('text', '')))
+    matched = [t for t in key_terms if t in resume_terms]
+    missing = [t for t in key_terms if t not in resume_terms]
+    score = round(10 * sum(weights[t] for t in matched) / sum(weights[t] for t in key_terms), 1)
+    if score >= 8:
+        recommendation = "Excellent keyword match; prioritise for review."
+    elif score >= 5:
+        recommendation = "Moderate keyword match; worth a closer look."
+    else:
+        recommendation = "Poor keyword match for this role."
+    return (
+        f"Score: {score}\n"
+        f"Recommendation: {recommendation}\n"
+        f"Strengths: {', '.join(matched[:8]) or 'None'}\n"
+        f"Gaps: {', '.join(missing[:8]) or 'None'}"
+    )
+
+# (label, function, rank): a stored result is only ever replaced by a backend of at least its rank,
+# so a cheap triage pass never overwrites a stronger model's score
+SCORING_BACKENDS = {
+    "openai": ("OpenAI", analyze_resume_with_gpt, 2),
+    "openai_compatible": ("OpenAI-compatible endpoint", analyze_resume_with_endpoint, 1),
+    "heuristic": ("Local heuristic (offline)", analyze_resume_with_heuristic, 0),
+}
+DEFAULT_SCORING_BACKEND = "openai"
+
+def scoring_backend_rank(scoring_backend):
+    # Rows from before scoring backends were recorded came from OpenAI
+    return SCORING_BACKENDS.get(scoring_backend or DEFAULT_SCORING_BACKEND, (None, None, 0))[2]
+
+def analyze_resume(resume_info, job_description, scoring_backend=DEFAULT_SCORING_BACKEND):
+    return SCORING_BACKENDS[scoring_backend][1](resume_info, job_description)
+
 def init_db():
+    wait_for_database_upload()
     # Download database from GitHub
     try:
         repo = github_setup()
@@ -240,7 +681,8 @@ def init_db():
         status TEXT,
         resume_path TEXT,
         job_title TEXT,
-        date_added DATE DEFAULT CURRENT_DATE
+        date_added DATE DEFAULT CURRENT_DATE,
+        scoring_backend TEXT
     )''')
     c.execute('''CREATE TABLE IF NOT EXISTS analysis2 (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -254,8 +696,69 @@ def init_db():
         status TEXT,
         resume_path TEXT,
         job_title TEXT,
-        date_added DATE DEFAULT CURRENT_DATE
+        date_added DATE DEFAULT CURRENT_DATE,
+        scoring_backend TEXT
+    )''')
+    # Cross-job results: one row per resume and job, unlike analysis which is unique per name/email
+    c.execute('''CREATE TABLE IF NOT EXISTS job_matches (
+        resume_path TEXT,
+        job_title TEXT,
+        name TEXT,
+        email TEXT,
+        mobile TEXT,
+        similarity REAL,
+        score REAL,
+        status TEXT,
+        strengths TEXT,
+        gaps TEXT,
+        recommendation TEXT,
+        scoring_backend TEXT,
+        date_added DATE DEFAULT CURRENT_DATE,
+        PRIMARY KEY (resume_path, job_title)
+    )''')
+    # Databases created before scoring backends existed lack the column
+    for table in ("analysis", "analysis2"):
+        c.execute(f"PRAGMA table_info({table})")
+        if "scoring_backend" not in [row[1] for row in c.fetchall()]:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN scoring_backend TEXT")
+    # Aggregates kept in step with analysis/analysis2 by update_summary_tables
+    c.execute('''CREATE TABLE IF NOT EXISTS summary_counts (
+        source TEXT,
+        job_title TEXT,
+        status TEXT,
+        day DATE,
+        count INTEGER DEFAULT 0,
+        PRIMARY KEY (source, job_title, status, day)
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS summary_scores (
+        source TEXT,
+        job_title TEXT,
+        bucket INTEGER,
+        count INTEGER DEFAULT 0,
+        PRIMARY KEY (source, job_title, bucket)
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS summary_postings (
+        source TEXT,
+        job_title TEXT,
+        total_score REAL DEFAULT 0,
+        count INTEGER DEFAULT 0,
+        PRIMARY KEY (source, job_title)
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS db_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
     )''')
+    # A flag rather than "summary tables are empty", so an empty history doesn't trigger a backfill each rerun.
+    # The local copy is replaced from GitHub on every rerun, so the backfill only stops once the flag and
+    # aggregates are uploaded; without a GitHub token no write outlives a rerun and it repeats.
+    c.execute("SELECT value FROM db_meta WHERE key = 'summaries_built'")
+    if not c.fetchone():
+        if rebuild_summary_tables(c):
+            # Still uncommitted, so this hashes the copy as downloaded; repeated backfills share a cache key
+            bump_write_generation(c, "rebuild:" + file_sha256(DATABASE))
+        c.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES ('summaries_built', 1)")
+        conn.commit()
+        upload_database()
     c.execute('''CREATE TABLE IF NOT EXISTS admin (
         username TEXT PRIMARY KEY,
         password TEXT
@@ -268,74 +771,211 @@ def init_db():
         conn.commit()
     conn.close()
 
-def store_analysis(name, email, mobile, strengths, score, recommendation, gaps, resume_path, job_title):
-    status = "Shortlisted" if float(score) >= 5 else "Rejected"
+# Cached queries include the write generation in their key, so any store bumps it to invalidate them.
+# It is a random token rather than a counter: init_db replaces the database from GitHub, and a counter
+# read back from an older copy would repeat a value already cached for different contents.
+def bump_write_generation(c, token=None):
+    c.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES ('write_generation', ?)",
+              (token or uuid.uuid4().hex,))
+
+def get_write_generation():
     conn = sqlite3.connect(DATABASE)
     c = conn.cursor()
-    today_date = datetime.date.today()
-    c.execute('''
-        SELECT COUNT(*) FROM analysis
+    c.execute("SELECT value FROM db_meta WHERE key = 'write_generation'")
+    row = c.fetchone()
+    conn.close()
+    if row:
+        return str(row[0])
+    # No store has run against this copy yet, so key on its content instead
+    return "sha:" + file_sha256(DATABASE)
+
+def score_bucket(score):
+    return min(max(int(float(score)), 0), 10)
+
+def update_summary_tables(c, source, job_title, status, score, day=None, delta=1):
+    # Called with the write's cursor so the aggregates commit in the same transaction.
+    # delta=-1 with the old row's values takes a result back out before it is re-scored.
+    c.execute('''INSERT INTO summary_counts (source, job_title, status, day, count) VALUES (?, ?, ?, COALESCE(?, CURRENT_DATE), ?)
+                 ON CONFLICT (source, job_title, status, day) DO UPDATE SET count = count + excluded.count''',
+              (source, job_title, status, day, delta))
+    c.execute('''INSERT INTO summary_scores (source, job_title, bucket, count) VALUES (?, ?, ?, ?)
+                 ON CONFLICT (source, job_title, bucket) DO UPDATE SET count = count + excluded.count''',
+              (source, job_title, score_bucket(score), delta))
+    c.execute('''INSERT INTO summary_postings (source, job_title, total_score, count) VALUES (?, ?, ?, ?)
+                 ON CONFLICT (source, job_title) DO UPDATE SET total_score = total_score + excluded.total_score, count = count + excluded.count''',
+              (source, job_title, delta * float(score), delta))
+    if delta < 0:
+        for table in ("summary_counts", "summary_scores", "summary_postings"):
+            c.execute(f'DELETE FROM {table} WHERE source = ? AND job_title = ? AND count <= 0', (source, job_title))
+
+def rebuild_summary_tables(c):
+    # Backfills the aggregates from existing rows, e.g. for a database created before they existed.
+    # Returns the number of postings backfilled, 0 when there was nothing to aggregate.
+    inserted = 0
+    for table in ("summary_counts", "summary_scores", "summary_postings"):
+        c.execute(f"DELETE FROM {table}")
+    for source in ("analysis", "analysis2"):
+        c.execute(f'''INSERT INTO summary_counts (source, job_title, status, day, count)
+                      SELECT ?, job_title, status, date_added, COUNT(*) FROM {source}
+                      GROUP BY job_title, status, date_added''', (source,))
+        c.execute(f'''INSERT INTO summary_scores (source, job_title, bucket, count)
+                      SELECT ?, job_title, MIN(MAX(CAST(score AS INTEGER), 0), 10) AS bucket, COUNT(*) FROM {source}
+                      GROUP BY job_title, bucket''', (source,))
+        c.execute(f'''INSERT INTO summary_postings (source, job_title, total_score, count)
+                      SELECT ?, job_title, SUM(score), COUNT(*) FROM {source}
+                      GROUP BY job_title''', (source,))
+        inserted += c.rowcount
+    return inserted
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_funnel_summary(source, start_date, end_date, generation):
+    with sqlite3.connect(DATABASE) as conn:
+        counts = pd.read_sql_query('''SELECT job_title, status, SUM(count) AS count FROM summary_counts
+                                      WHERE source = ? AND day BETWEEN ? AND ?
+                                      GROUP BY job_title, status''',
+                                   conn, params=(source, str(start_date), str(end_date)))
+        daily = pd.read_sql_query('''SELECT day, status, SUM(count) AS count FROM summary_counts
+                                     WHERE source = ? AND day BETWEEN ? AND ?
+                                     GROUP BY day, status''',
+                                  conn, params=(source, str(start_date), str(end_date)))
+        scores = pd.read_sql_query('''SELECT bucket, SUM(count) AS count FROM summary_scores
+                                      WHERE source = ? GROUP BY bucket ORDER BY bucket''',
+                                   conn, params=(source,))
+        postings = pd.read_sql_query('''SELECT job_title, count AS candidates, ROUND(total_score / count, 2) AS average_score
+                                        FROM summary_postings WHERE source = ? ORDER BY job_title''',
+                                     conn, params=(source,))
+    return counts, daily, scores, postings
+
+def has_conflicting_candidate(c, table, name, email, mobile):
+    c.execute(f'''
+        SELECT COUNT(*) FROM {table}
         WHERE name = ? AND email = ? AND mobile = ? AND date_added = ?
-    ''', (name, email, mobile, today_date))
+    ''', (name, email, mobile, datetime.date.today()))
     if c.fetchone()[0] > 0:
-        print("Duplicate entry for the same person on the same day! No data inserted.")
+        return True
+    if table == "analysis":
+        # analysis has UNIQUE name and email columns
+        c.execute('SELECT COUNT(*) FROM analysis WHERE name = ? OR email = ?', (name, email))
+        return c.fetchone()[0] > 0
+    return False
+
+def find_stored_result(c, table, resume_path, job_title):
+    c.execute(f'''SELECT id, status, score, date_added, scoring_backend FROM {table}
+                  WHERE resume_path = ? AND job_title = ? ORDER BY id DESC LIMIT 1''', (resume_path, job_title))
+    return c.fetchone()
+
+def can_store_result(table, name, email, mobile, resume_path, job_title, scoring_backend):
+    # Checked before calling a scoring backend so no call is paid for a result that would be dropped
+    conn = sqlite3.connect(DATABASE)
+    c = conn.cursor()
+    existing = find_stored_result(c, table, resume_path, job_title)
+    if existing:
+        allowed = scoring_backend_rank(existing[4]) <= scoring_backend_rank(scoring_backend)
     else:
-        c.execute('''INSERT INTO analysis (name, email, mobile, strengths, gaps, recommendation, score, status, resume_path, job_title, date_added)
-                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_DATE)''',
-                  (name, email, mobile, strengths, gaps, recommendation, score, status, resume_path, job_title))
-        # Optional: Upload updated database to GitHub
-        repo = github_setup()
-        if repo:
-            github_upload_file(repo, DATABASE, GITHUB_DB_PATH, "Update database")
-    conn.commit()
+        allowed = not has_conflicting_candidate(c, table, name, email, mobile)
     conn.close()
+    return allowed
 
-def store_quick_analysis(name, email, mobile, strengths, score, recommendation, gaps, resume_path, job_title):
+def store_result(table, name, email, mobile, strengths, score, recommendation, gaps, resume_path, job_title,
+                 scoring_backend):
+    # Returns whether a row was written. A resume already scored for this job is re-scored in place,
+    # e.g. the OpenAI pass over a short list that was triaged with the heuristic backend.
     status = "Shortlisted" if float(score) >= 5 else "Rejected"
     conn = sqlite3.connect(DATABASE)
     c = conn.cursor()
-    today_date = datetime.date.today()
-    c.execute('''
-        SELECT COUNT(*) FROM analysis2
-        WHERE name = ? AND email = ? AND mobile = ? AND date_added = ?
-    ''', (name, email, mobile, today_date))
-    if c.fetchone()[0] > 0:
-        print("Duplicate entry for the same person on the same day! No data inserted.")
+    existing = find_stored_result(c, table, resume_path, job_title)
+    if existing and scoring_backend_rank(existing[4]) > scoring_backend_rank(scoring_backend):
+        print("Result from a stronger scoring backend already stored! No data updated.")
+        conn.close()
+        return False
+    if existing:
+        row_id, old_status, old_score, old_day, _ = existing
+        c.execute(f'''UPDATE {table} SET strengths = ?, gaps = ?, recommendation = ?, score = ?, status = ?, scoring_backend = ?
+                      WHERE id = ?''',
+                  (strengths, gaps, recommendation, score, status, scoring_backend, row_id))
+        update_summary_tables(c, table, job_title, old_status, old_score or 0, day=old_day, delta=-1)
+        update_summary_tables(c, table, job_title, status, score, day=old_day)
+    elif has_conflicting_candidate(c, table, name, email, mobile):
+        print("Duplicate entry for this candidate! No data inserted.")
+        conn.close()
+        return False
     else:
-        c.execute('''INSERT INTO analysis2 (name, email, mobile, strengths, gaps, recommendation, score, status, resume_path, job_title, date_added)
-                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_DATE)''',
-                  (name, email, mobile, strengths, gaps, recommendation, score, status, resume_path, job_title))
-        # Optional: Upload updated database to GitHub
-        repo = github_setup()
-        if repo:
-            github_upload_file(repo, DATABASE, GITHUB_DB_PATH, "Update database")
+        c.execute(f'''INSERT INTO {table} (name, email, mobile, strengths, gaps, recommendation, score, status, resume_path, job_title, date_added, scoring_backend)
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_DATE, ?)''',
+                  (name, email, mobile, strengths, gaps, recommendation, score, status, resume_path, job_title, scoring_backend))
+        update_summary_tables(c, table, job_title, status, score)
+    bump_write_generation(c)
     conn.commit()
     conn.close()
+    upload_database()
+    return True
+
+def store_analysis(name, email, mobile, strengths, score, recommendation, gaps, resume_path, job_title,
+                   scoring_backend=DEFAULT_SCORING_BACKEND):
+    return store_result("analysis", name, email, mobile, strengths, score, recommendation, gaps,
+                        resume_path, job_title, scoring_backend)
 
-def is_resume_processed(resume_path, job_title):
+def store_quick_analysis(name, email, mobile, strengths, score, recommendation, gaps, resume_path, job_title,
+                         scoring_backend=DEFAULT_SCORING_BACKEND):
+    return store_result("analysis2", name, email, mobile, strengths, score, recommendation, gaps,
+                        resume_path, job_title, scoring_backend)
+
+def is_result_processed(table, resume_path, job_title, scoring_backend):
+    # Processed once scored by this backend or a stronger one; a weaker result is worth re-scoring
     conn = sqlite3.connect(DATABASE)
     c = conn.cursor()
-    c.execute('SELECT COUNT(*) FROM analysis WHERE resume_path = ? AND job_title = ?', (resume_path, job_title))
-    count = c.fetchone()[0]
+    c.execute(f'SELECT scoring_backend FROM {table} WHERE resume_path = ? AND job_title = ?', (resume_path, job_title))
+    backends = [row[0] for row in c.fetchall()]
     conn.close()
-    return count > 0
+    return any(scoring_backend_rank(backend) >= scoring_backend_rank(scoring_backend) for backend in backends)
 
-def is_resume_processed_quick(resume_path, job_title):
+def is_result_shortlisted(table, resume_path, job_title):
     conn = sqlite3.connect(DATABASE)
     c = conn.cursor()
-    c.execute('SELECT COUNT(*) FROM analysis2 WHERE resume_path = ? AND job_title = ?', (resume_path, job_title))
+    c.execute(f"SELECT COUNT(*) FROM {table} WHERE resume_path = ? AND job_title = ? AND status = 'Shortlisted'",
+              (resume_path, job_title))
     count = c.fetchone()[0]
     conn.close()
     return count > 0
 
-def load_data():
+def is_resume_processed(resume_path, job_title, scoring_backend=DEFAULT_SCORING_BACKEND):
+    return is_result_processed("analysis", resume_path, job_title, scoring_backend)
+
+def is_resume_processed_quick(resume_path, job_title, scoring_backend=DEFAULT_SCORING_BACKEND):
+    return is_result_processed("analysis2", resume_path, job_title, scoring_backend)
+
+def filter_results(df, start_date, end_date, subject_filter, status_filter, top_scorers_filter):
+    if 'date_added' in df.columns:
+        df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
+        filtered_df = df[
+            (df['date_added'].dt.date >= start_date) &
+            (df['date_added'].dt.date <= end_date)
+        ]
+    else:
+        filtered_df = df
+    if subject_filter:
+        filtered_df = filtered_df[filtered_df['job_title'].str.contains(subject_filter, case=False, na=False)]
+    if status_filter != "All":
+        filtered_df = filtered_df[filtered_df['status'] == status_filter]
+    if top_scorers_filter != "All":
+        n = int(top_scorers_filter.split()[1])
+        filtered_df = filtered_df.sort_values('score', ascending=False).head(n)
+    return filtered_df
+
+# Shared across sessions; `generation` only exists to key the cache on the database's last write
+@st.cache_data(show_spinner=False, max_entries=256)
+def query_results(table, generation, filters=None):
+    with sqlite3.connect(DATABASE) as conn:
+        df = pd.read_sql_query(f"SELECT * FROM {table} ORDER BY id DESC LIMIT 20", conn)
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    if filters:
+        df = filter_results(df, *filters)
+    return df
+
+def load_data(filters=None):
+    table = "analysis2" if st.session_state.page == "quick_analysis" else "analysis"
     try:
-        with sqlite3.connect(DATABASE) as conn:
-            if st.session_state.page == "quick_analysis":
-                df = pd.read_sql_query("SELECT * FROM analysis2", conn)
-            else:
-                df = pd.read_sql_query("SELECT * FROM analysis", conn)
-            return df.sort_values(by='id', ascending=False).head(20)
+        return query_results(table, get_write_generation(), filters)
     except Exception as e:
         st.error(f"Failed to load data: {e}")
         return pd.DataFrame()
@@ -343,6 +983,194 @@ def load_data():
 def normalize_folder_name(text):
     return re.sub(r'\W+', '_', text.strip().lower())
 
+# Cross-job matching: local hashed TF-IDF vectors, cached per file content in MATCH_VECTOR_FILE
+TOKEN_REGEX = r'[a-z][a-z0-9+#]*'
+STOPWORDS = {
+    "and", "the", "for", "with", "to", "of", "in", "on", "a", "an", "is", "are", "be", "as", "at",
+    "or", "by", "from", "we", "you", "our", "your", "will", "this", "that", "have", "has", "it"
+}
+
+def tokenize(text):
+    return [t for t in re.findall(TOKEN_REGEX, text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+def text_vector(text):
+    # crc32 rather than hash() so vectors stay comparable across processes
+    indices = [zlib.crc32(token.encode("utf-8")) % MATCH_VECTOR_DIM for token in tokenize(text)]
+    counts = np.bincount(np.array(indices, dtype=np.int64), minlength=MATCH_VECTOR_DIM)
+    return np.log1p(counts).astype(np.float32)
+
+def load_match_vector_store():
+    if not os.path.exists(MATCH_VECTOR_FILE):
+        return {}
+    try:
+        with np.load(MATCH_VECTOR_FILE) as data:
+            return {content_hash: data[content_hash] for content_hash in data.files}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable {MATCH_VECTOR_FILE}: {e}")
+        return {}
+
+def save_match_vector_store(store):
+    # Written to a temp file and renamed so concurrent readers never see a partial archive
+    fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(os.path.abspath(MATCH_VECTOR_FILE)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **store)
+        os.replace(tmp_path, MATCH_VECTOR_FILE)
+    except OSError as e:
+        print(f"Failed to save {MATCH_VECTOR_FILE}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def build_match_vectors(items):
+    # items are (content_hash, load_text) pairs; text is only loaded for content not seen before
+    store = load_match_vector_store()
+    vectors = []
+    added = False
+    for content_hash, load_text in items:
+        if content_hash not in store:
+            store[content_hash] = text_vector(load_text() or "")
+            added = True
+        vectors.append(store[content_hash])
+    if added:
+        save_match_vector_store(store)
+    if not vectors:
+        return np.zeros((0, MATCH_VECTOR_DIM), dtype=np.float32)
+    return np.vstack(vectors)
+
+def relevance_matrix(resume_vectors, jd_vectors):
+    # Cosine similarity of TF-IDF vectors, with IDF taken over all resumes and JDs together
+    docs = np.vstack([resume_vectors, jd_vectors])
+    doc_freq = (docs > 0).sum(axis=0)
+    idf = np.log((1 + len(docs)) / (1 + doc_freq)) + 1
+
+    def normalize(matrix):
+        weighted = matrix * idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return weighted / norms
+
+    return normalize(resume_vectors) @ normalize(jd_vectors).T
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def list_job_descriptions():
+    jds = []
+    if not os.path.isdir(JD_FOLDER):
+        return jds
+    for jd_filename in sorted(os.listdir(JD_FOLDER)):
+        jd_path = os.path.join(JD_FOLDER, jd_filename)
+        if not os.path.isfile(jd_path):
+            continue
+        job_title = extract_job_title_from_filename(jd_path)
+        if job_title == "Not found":
+            continue
+        jds.append((file_sha256(jd_path), jd_path, job_title))
+    return jds
+
+def list_all_resumes():
+    resumes = {digest: blob_path for digest, blob_path, _, _ in read_blob_index()}
+    # Include files from the pre-blob-store layout under Resumes/ and its subfolders
+    for root, _, files in os.walk(RESUME_FOLDER):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            resumes.setdefault(file_sha256(path), path)
+    return sorted(resumes.items(), key=lambda item: item[1])
+
+def load_resume_text(resume_path):
+    local_resume = fetch_resume_file(resume_path)
+    resume_info = extract_resume_info(local_resume) if local_resume else None
+    return resume_info['text'] if resume_info else ""
+
+def match_resumes_to_jobs():
+    jds = list_job_descriptions()
+    resumes = list_all_resumes()
+    jd_vectors = build_match_vectors(
+        [(content_hash, lambda path=jd_path: read_job_description(path)) for content_hash, jd_path, _ in jds]
+    )
+    resume_vectors = build_match_vectors(
+        [(content_hash, lambda path=resume_path: load_resume_text(path)) for content_hash, resume_path in resumes]
+    )
+    if not jds or not resumes:
+        return jds, [path for _, path in resumes], np.zeros((len(resumes), len(jds)))
+    return jds, [path for _, path in resumes], relevance_matrix(resume_vectors, jd_vectors)
+
+def is_match_evaluated(resume_path, job_title, scoring_backend):
+    return is_result_processed("job_matches", resume_path, job_title, scoring_backend)
+
+def store_job_match(resume_info, resume_path, job_title, similarity, score, strengths, recommendation, gaps,
+                    scoring_backend):
+    # A later evaluation of the same pair (e.g. OpenAI after a heuristic triage) replaces the earlier one,
+    # unless the earlier one came from a stronger backend; returns whether a row was written
+    status = "Shortlisted" if float(score) >= 5 else "Rejected"
+    conn = sqlite3.connect(DATABASE)
+    c = conn.cursor()
+    c.execute('SELECT scoring_backend FROM job_matches WHERE resume_path = ? AND job_title = ?', (resume_path, job_title))
+    row = c.fetchone()
+    if row and scoring_backend_rank(row[0]) > scoring_backend_rank(scoring_backend):
+        conn.close()
+        return False
+    c.execute('''INSERT INTO job_matches (resume_path, job_title, name, email, mobile, similarity, score, status,
+                                          strengths, gaps, recommendation, scoring_backend, date_added)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_DATE)
+                 ON CONFLICT (resume_path, job_title) DO UPDATE SET
+                     similarity = excluded.similarity, score = excluded.score, status = excluded.status,
+                     strengths = excluded.strengths, gaps = excluded.gaps, recommendation = excluded.recommendation,
+                     scoring_backend = excluded.scoring_backend, date_added = excluded.date_added''',
+              (resume_path, job_title, resume_info.get('name', 'Not found'), resume_info.get('email', 'Not found'),
+               resume_info.get('mobile', 'Not found'), float(similarity), score, status,
+               strengths, gaps, recommendation, scoring_backend))
+    bump_write_generation(c)
+    conn.commit()
+    conn.close()
+    upload_database()
+    return True
+
+def load_job_matches(resume_paths):
+    with sqlite3.connect(DATABASE) as conn:
+        df = pd.read_sql_query('''SELECT resume_path, name, job_title, similarity, score, status, recommendation,
+                                         scoring_backend FROM job_matches ORDER BY score DESC, similarity DESC''', conn)
+    return df[df['resume_path'].isin(resume_paths)].drop(columns=['resume_path'])
+
+def bulk_export_section(table, start_date, end_date, subject_filter, status_filter, top_scorers_filter, key):
+    # Exports cover the full history matching the filters, not just the latest rows shown above
+    with st.expander("Bulk Export"):
+        col1, col2 = st.columns(2)
+        export_format = col1.selectbox("Format", EXPORT_FORMATS, key=f"{key}_format")
+        include_resumes = col2.checkbox("Include ZIP of resume files", key=f"{key}_resumes")
+        if st.button("Prepare Export", key=f"{key}_prepare"):
+            filters = dict(
+                table=table, start_date=start_date, end_date=end_date, job_title=subject_filter,
+                status=status_filter, top_n=None if top_scorers_filter == "All" else int(top_scorers_filter.split()[1])
+            )
+            # Buttons are only offered on this rerun; the files are read once here and then deleted
+            export_dir = tempfile.mkdtemp(prefix="export_")
+            try:
+                paths = [os.path.join(export_dir, f"{table}_results.{export_format}")]
+                with st.spinner("Preparing export..."):
+                    with open(paths[0], "wb") as out:
+                        export_results(out, export_format, DATABASE, **filters)
+                    if include_resumes:
+                        paths.append(os.path.join(export_dir, f"{table}_resumes.zip"))
+                        with open(paths[1], "wb") as out:
+                            write_resume_zip(out, DATABASE, resolve_path=fetch_resume_file, **filters)
+                for path in paths:
+                    with open(path, "rb") as file:
+                        st.download_button(
+                            label=f"Download {os.path.basename(path)}",
+                            data=file,
+                            file_name=os.path.basename(path),
+                            mime=EXPORT_MIME_TYPES[os.path.splitext(path)[1].lstrip(".")],
+                            key=f"{key}_download_{os.path.basename(path)}",
+                            on_click="ignore"  # No rerun, so the other export's button stays available
+                        )
+            finally:
+                shutil.rmtree(export_dir, ignore_errors=True)
+
 # Streamlit UI
 init_db()
 if "logged_in" not in st.session_state:
@@ -376,10 +1204,10 @@ if not st.session_state.logged_in:
 # Sidebar
 st.sidebar.title("AI Recruitment")
 if st.session_state.page != "change_password":
-    page = st.sidebar.radio("Navigation", ["Dashboard", "Process Gmail", "Quick Analysis"], key="nav_radio")
+    page = st.sidebar.radio("Navigation", ["Dashboard", "Hiring Funnel", "Process Gmail", "Quick Analysis"], key="nav_radio")
     st.session_state.page = page.lower().replace(" ", "_")
 else:
-    st.sidebar.radio("Navigation", ["Dashboard", "Process Gmail", "Quick Analysis"], key="nav_radio", disabled=True)
+    st.sidebar.radio("Navigation", ["Dashboard", "Hiring Funnel", "Process Gmail", "Quick Analysis"], key="nav_radio", disabled=True)
 
 if st.sidebar.button("Logout"):
     st.session_state.logged_in = False
@@ -459,23 +1287,10 @@ elif st.session_state.page == "dashboard":
         )
         submit_button = st.form_submit_button("Show Results")
     if submit_button:
-        df = load_data()
-        df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-        if 'date_added' in df.columns:
-            df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
-            filtered_df = df[
-                (df['date_added'].dt.date >= start_date) &
-                (df['date_added'].dt.date <= end_date)
-            ]
-        else:
-            filtered_df = df
-        if subject_filter:
-            filtered_df = filtered_df[filtered_df['job_title'].str.contains(subject_filter, case=False, na=False)]
-        if status_filter != "All":
-            filtered_df = filtered_df[filtered_df['status'] == status_filter]
-        if top_scorers_filter != "All":
-            n = int(top_scorers_filter.split()[1])
-            filtered_df = filtered_df.sort_values('score', ascending=False).head(n)
+        st.session_state.dashboard_filters = (start_date, end_date, subject_filter, status_filter, top_scorers_filter)
+    # Kept across reruns so results stay visible after clicking a per-report button
+    if st.session_state.get("dashboard_filters"):
+        filtered_df = load_data(st.session_state.dashboard_filters)
         mcol1, mcol2, mcol3 = st.columns(3)
         with mcol1:
             st.metric("Total Resumes", len(filtered_df))
@@ -513,20 +1328,42 @@ elif st.session_state.page == "dashboard":
                     col1, col2 = st.columns([1, 3])
                     col1.markdown('<span class="label">Job Title</span>', unsafe_allow_html=True)
                     col2.markdown(f'<span class="value">{row["job_title"]}</span>', unsafe_allow_html=True)
-                    resume_path = row.get('resume_path', None)
-                    if resume_path and os.path.exists(resume_path):
-                        with open(resume_path, "rb") as file:
-                            st.download_button(
-                                label="📄 Download Resume",
-                                data=file,
-                                file_name=os.path.basename(resume_path),
-                                mime="application/octet-stream",
-                                key=f"download_resume_{index}"
-                            )
-                    else:
-                        st.error("Resume file not found or path missing in database.")
+                    col1, col2 = st.columns([1, 3])
+                    col1.markdown('<span class="label">Scored By</span>', unsafe_allow_html=True)
+                    col2.markdown(f'<span class="value">{row.get("scoring_backend") or DEFAULT_SCORING_BACKEND}</span>', unsafe_allow_html=True)
+                    resume_download_button(row.get('resume_path', None), f"download_resume_{index}")
         else:
             st.info("No results found matching the filters.")
+    bulk_export_section("analysis", start_date, end_date, subject_filter, status_filter, top_scorers_filter, "dashboard_export")
+
+elif st.session_state.page == "hiring_funnel":
+    st.title("Hiring Funnel")
+    col1, col2, col3 = st.columns([1, 1, 1.5])
+    start_date = col1.date_input("Start Date", datetime.date.today() - datetime.timedelta(days=90))
+    end_date = col2.date_input("End Date", datetime.date.today())
+    source_label = col3.selectbox("Source", ["Process Gmail", "Quick Analysis"])
+    source = "analysis" if source_label == "Process Gmail" else "analysis2"
+    counts, daily, scores, postings = load_funnel_summary(source, start_date, end_date, get_write_generation())
+    mcol1, mcol2, mcol3 = st.columns(3)
+    with mcol1:
+        st.metric("Total Resumes", int(counts['count'].sum()))
+    with mcol2:
+        st.metric("Shortlisted", int(counts.loc[counts['status'] == "Shortlisted", 'count'].sum()))
+    with mcol3:
+        st.metric("Rejected", int(counts.loc[counts['status'] == "Rejected", 'count'].sum()))
+    if counts.empty:
+        st.info("No analyses recorded in this date range.")
+    else:
+        st.subheader("By Job Title")
+        st.dataframe(counts.pivot_table(index='job_title', columns='status', values='count', aggfunc='sum', fill_value=0),
+                     use_container_width=True)
+        st.subheader("Per Day")
+        st.bar_chart(daily.pivot_table(index='day', columns='status', values='count', aggfunc='sum', fill_value=0))
+    st.subheader("Score Distribution (all time)")
+    if not scores.empty:
+        st.bar_chart(scores.set_index('bucket'))
+    st.subheader("Average Score per Posting (all time)")
+    st.dataframe(postings, use_container_width=True)
 
 elif st.session_state.page == "process_gmail":
     st.title("Process Gmail Resumes")
@@ -534,6 +1371,13 @@ elif st.session_state.page == "process_gmail":
     col1, col2 = st.columns(2)
     start_date = col1.date_input("Start Date", datetime.date.today() - datetime.timedelta(days=7))
     end_date = col2.date_input("End Date", datetime.date.today())
+    scoring_backend = st.selectbox(
+        "Scoring Backend", list(SCORING_BACKENDS), format_func=lambda key: SCORING_BACKENDS[key][0], key="gmail_backend"
+    )
+    shortlisted_only = st.checkbox(
+        "Only re-score shortlisted candidates", key="gmail_shortlisted_only",
+        help="Run a cheap backend over everyone first, then use this with a stronger one to score just the short list."
+    )
     st.subheader("Upload Job Descriptions")
     uploaded_files = st.file_uploader("Upload JD files", type=["txt", "docx", "pdf"], accept_multiple_files=True)
     if uploaded_files:
@@ -555,11 +1399,9 @@ elif st.session_state.page == "process_gmail":
         if not folder_name or "application_for" not in folder_name:
             st.error("Please enter a valid subject starting with 'Application for' (e.g., 'Application for Data Scientist').")
         else:
-            resume_subfolder = os.path.join(RESUME_FOLDER, folder_name)
-            os.makedirs(resume_subfolder, exist_ok=True)
             messages = search_emails(service, subject_text=subject, after_date=after_date, before_date=before_date)
-            downloaded = download_attachments(service, messages, destination_folder=resume_subfolder)
-            st.success(f"Downloaded {downloaded} resumes to {resume_subfolder}.")
+            downloaded = download_attachments(service, messages, folder=folder_name)
+            st.success(f"Downloaded {downloaded} resumes for {folder_name}.")
     if st.button("Process Resumes"):
         with st.spinner("Processing resumes..."):
             jd_files = [f for f in os.listdir(JD_FOLDER) if os.path.isfile(os.path.join(JD_FOLDER, f))]
@@ -574,64 +1416,46 @@ elif st.session_state.page == "process_gmail":
                     try:
                         base_name = os.path.splitext(jd_filename)[0]
                         folder_name = normalize_folder_name(base_name)
-                        resume_subfolder = os.path.join(RESUME_FOLDER, folder_name)
-                        if not os.path.exists(resume_subfolder):
+                        resume_paths = list_folder_resumes(folder_name)
+                        if not resume_paths:
                             continue
                         job_title = extract_job_title_from_filename(jd_path)
                         if job_title == "Not found":
                             continue
-                        ext = os.path.splitext(jd_path)[1].lower()
-                        if ext == '.txt':
-                            job_description = open(jd_path, 'r', encoding='utf-8').read()
-                        elif ext == '.docx':
-                            job_description = extract_text_from_docx(jd_path)
-                        elif ext == '.pdf':
-                            job_description = extract_pdf_text(jd_path)
-                        else:
-                            continue
+                        job_description = read_job_description(jd_path)
                         if not job_description:
                             continue
                         processed = 0
                         failed = 0
-                        for filename in os.listdir(resume_subfolder):
-                            resume_path = os.path.join(resume_subfolder, filename)
-                            if is_resume_processed(resume_path, job_title):
+                        for resume_path in resume_paths:
+                            if shortlisted_only and not is_result_shortlisted("analysis", resume_path, job_title):
                                 continue
-                            resume_info = extract_resume_info(resume_path)
-                            if not resume_info or resume_info['name'] == 'Not found':
-                                failed += 1
+                            if is_resume_processed(resume_path, job_title, scoring_backend):
                                 continue
-                            result = analyze_resume_with_gpt(resume_info, job_description)
-                            if not result:
+                            local_resume = fetch_resume_file(resume_path)
+                            resume_info = extract_resume_info(local_resume) if local_resume else None
+                            if not resume_info or resume_info['name'] == 'Not found':
                                 failed += 1
                                 continue
-                            score = 0
-                            strengths = ""
-                            recommendation = ""
-                            gaps = ""
-                            for line in result.splitlines():
-                                if "score" in line.lower():
-                                    try:
-                                        match = re.search(r'score.*?:\s*(\d+\.?\d*)', line, re.IGNORECASE)
-                                        if match:
-                                            score = float(match.group(1))
-                                    except:
-                                        pass
-                                elif "strengths" in line.lower():
-                                    strengths = line.split(":", 1)[-1].strip()
-                                elif "recommendation" in line.lower():
-                                    recommendation = line.split(":", 1)[-1].strip()
-                                elif "gap" in line.lower():
-                                    gaps = line.split(":", 1)[-1].strip()
                             name = resume_info.get('name', 'Not found')
                             email = resume_info.get('email', 'Not found')
                             mobile = resume_info.get('mobile', 'Not found')
-                            store_analysis(
+                            if not can_store_result("analysis", name, email, mobile, resume_path, job_title, scoring_backend):
+                                failed += 1
+                                continue
+                            result = analyze_resume(resume_info, job_description, scoring_backend)
+                            if not result:
+                                failed += 1
+                                continue
+                            score, strengths, recommendation, gaps = parse_analysis_result(result)
+                            if store_analysis(
                                 name, email, mobile,
                                 strengths, score, recommendation, gaps,
-                                resume_path, job_title
-                            )
-                            processed += 1
+                                resume_path, job_title, scoring_backend
+                            ):
+                                processed += 1
+                            else:
+                                failed += 1
                         total_processed += processed
                         total_failed += failed
                         processed_jds += 1
@@ -642,67 +1466,113 @@ elif st.session_state.page == "process_gmail":
                     st.error(f"No resume subfolders found for any job descriptions in {JD_FOLDER}.")
                 else:
                     st.success(f"Total: Processed {total_processed} resumes. Failed: {total_failed}.")
+    st.subheader("Cross-Job Matching")
+    st.caption("Ranks every resume against every job description, then runs the scoring backend only on each candidate's best-fit roles.")
+    evaluations_per_candidate = st.number_input("Evaluations per candidate", min_value=0, max_value=5, value=1)
+    if st.button("Match Across All Jobs"):
+        with st.spinner("Matching resumes to jobs..."):
+            jds, resume_paths, matrix = match_resumes_to_jobs()
+            if not jds or not resume_paths:
+                st.error(f"Need at least one job description in {JD_FOLDER} and one resume to match.")
+            else:
+                job_titles = [job_title for _, _, job_title in jds]
+                ranking = np.argsort(-matrix, axis=1)
+                st.dataframe(pd.DataFrame([
+                    {
+                        "Candidate": resume_original_name(resume_path),
+                        "Best-fit roles": ", ".join(
+                            f"{job_titles[j]} ({matrix[i, j]:.2f})" for j in ranking[i, :3] if matrix[i, j] > 0
+                        )
+                    }
+                    for i, resume_path in enumerate(resume_paths)
+                ]), use_container_width=True)
+                processed = 0
+                failed = 0
+                job_descriptions = {}
+                for i, resume_path in enumerate(resume_paths):
+                    top_jobs = [j for j in ranking[i, :evaluations_per_candidate] if matrix[i, j] > 0]
+                    resume_info = None
+                    for j in top_jobs:
+                        _, jd_path, job_title = jds[j]
+                        if shortlisted_only and not is_result_shortlisted("job_matches", resume_path, job_title):
+                            continue
+                        if is_match_evaluated(resume_path, job_title, scoring_backend):
+                            continue
+                        if resume_info is None:
+                            local_resume = fetch_resume_file(resume_path)
+                            resume_info = (extract_resume_info(local_resume) if local_resume else None) or {}
+                        if resume_info.get('name', 'Not found') == 'Not found':
+                            failed += 1
+                            break
+                        if jd_path not in job_descriptions:
+                            job_descriptions[jd_path] = read_job_description(jd_path)
+                        result = analyze_resume(resume_info, job_descriptions[jd_path], scoring_backend)
+                        if not result:
+                            failed += 1
+                            continue
+                        score, strengths, recommendation, gaps = parse_analysis_result(result)
+                        if store_job_match(
+                            resume_info, resume_path, job_title, matrix[i, j],
+                            score, strengths, recommendation, gaps, scoring_backend
+                        ):
+                            processed += 1
+                        else:
+                            failed += 1
+                st.success(f"Matched {len(resume_paths)} resumes against {len(jds)} jobs. Evaluated {processed} pairs. Failed: {failed}.")
+                matches = load_job_matches(resume_paths)
+                if not matches.empty:
+                    st.subheader("Cross-Job Evaluations")
+                    st.dataframe(matches, use_container_width=True)
 
 elif st.session_state.page == "quick_analysis":
     st.title("Quick Resume Analysis")
-    if 'data' not in st.session_state:
-        st.session_state.data = None
     if 'process_successful' not in st.session_state:
         st.session_state.process_successful = False
     uploaded_jd = st.file_uploader("Upload Job Description", type=["pdf", "doc", "docx"])
     uploaded_resumes = st.file_uploader("Upload Resumes", type=["pdf", "doc", "docx"], accept_multiple_files=True)
+    scoring_backend = st.selectbox(
+        "Scoring Backend", list(SCORING_BACKENDS), format_func=lambda key: SCORING_BACKENDS[key][0], key="quick_backend"
+    )
+    shortlisted_only = st.checkbox(
+        "Only re-score shortlisted candidates", key="quick_shortlisted_only",
+        help="Run a cheap backend over everyone first, then use this with a stronger one to score just the short list."
+    )
     if st.button("Process Resumes"):
         with st.spinner("Processing resumes..."):
             if uploaded_jd and uploaded_resumes:
                 try:
-                    os.makedirs(JD_FOLDER, exist_ok=True)
-                    os.makedirs(RESUME_FOLDER, exist_ok=True)
                     jd_path = os.path.join(JD_FOLDER, uploaded_jd.name)
-                    with open(jd_path, "wb") as f:
-                        f.write(uploaded_jd.read())
-                    # Optional: Upload to GitHub
-                    repo = github_setup()
-                    if repo:
-                        github_upload_file(repo, jd_path, f"{GITHUB_JD_PATH}/{uploaded_jd.name}")
+                    jd_data = uploaded_jd.getvalue()
                     if jd_path.endswith(('.docx', '.doc')):
-                        jd_text = extract_text_from_docx(jd_path)
+                        jd_text = extract_text_from_docx(io.BytesIO(jd_data))
                     elif jd_path.endswith('.pdf'):
-                        jd_text = extract_pdf_text(jd_path)
+                        jd_text = extract_pdf_text(io.BytesIO(jd_data))
                     else:
                         raise ValueError("Unsupported Job Description file format.")
+                    job_title = extract_job_title_from_filename(jd_path)
+                    # Optional: Upload to GitHub (in the background, off the scoring path)
+                    repo = github_setup()
+                    jd_upload = persist_upload_async(jd_data, jd_path, repo, f"{GITHUB_JD_PATH}/{uploaded_jd.name}")
                     for uploaded_resume in uploaded_resumes:
-                        resume_path = os.path.join(RESUME_FOLDER, uploaded_resume.name)
-                        with open(resume_path, "wb") as f:
-                            f.write(uploaded_resume.read())
-                        # Optional: Upload to GitHub
-                        if repo:
-                            github_upload_file(repo, resume_path, f"{GITHUB_RESUME_PATH}/{uploaded_resume.name}")
-                        job_title = extract_job_title_from_filename(jd_path)
-                        if is_resume_processed_quick(resume_path, job_title):
+                        resume_data = uploaded_resume.getvalue()
+                        _, resume_path = resume_blob_path(resume_data, uploaded_resume.name)
+                        if shortlisted_only and not is_result_shortlisted("analysis2", resume_path, job_title):
                             continue
-                        resume_info = extract_resume_info(resume_path)
+                        if is_resume_processed_quick(resume_path, job_title, scoring_backend):
+                            continue
+                        store_resume_blob(resume_data, uploaded_resume.name, repo=repo, background=True)
+                        resume_info = extract_resume_info(resume_path, stream=io.BytesIO(resume_data))
                         if not resume_info:
                             continue
-                        result = analyze_resume_with_gpt(resume_info, jd_text)
+                        if not can_store_result(
+                            "analysis2", resume_info.get('name', 'Not found'), resume_info.get('email', 'Not found'),
+                            resume_info.get('mobile', 'Not found'), resume_path, job_title, scoring_backend
+                        ):
+                            continue
+                        result = analyze_resume(resume_info, jd_text, scoring_backend)
                         if not result:
                             continue
-                        score = 0
-                        recommendation = ""
-                        gaps = ""
-                        strengths = ""
-                        for line in result.splitlines():
-                            if "score" in line.lower():
-                                try:
-                                    match = re.search(r'score.*?:\s*(\d+\.?\d*)', line, re.IGNORECASE)
-                                    score = float(match.group(1)) if match else 0
-                                except:
-                                    score = 0
-                            elif "recommendation" in line.lower():
-                                recommendation = line.split(":", 1)[-1].strip()
-                            elif "gap" in line.lower():
-                                gaps = line.split(":", 1)[-1].strip()
-                            elif "strength" in line.lower():
-                                strengths = line.split(":", 1)[-1].strip()
+                        score, strengths, recommendation, gaps = parse_analysis_result(result)
                         name = resume_info.get('name', 'Not found')
                         email = resume_info.get('email', 'Not found')
                         mobile = resume_info.get('mobile', 'Not found')
@@ -715,19 +1585,21 @@ elif st.session_state.page == "quick_analysis":
                             recommendation,
                             gaps,
                             resume_path,
-                            job_title
+                            job_title,
+                            scoring_backend
                         )
+                    if repo:
+                        background_executor().submit(sync_blob_index, repo)
+                        if not jd_upload.result():
+                            st.warning(f"Failed to upload {uploaded_jd.name} to GitHub; a JD with that name may already exist.")
                     st.success("Quick Analysis results saved successfully!")
                     st.session_state.process_successful = True
-                    st.session_state.data = load_data()
                 except Exception as e:
                     st.error(f"Failed to process resumes: {e}")
             else:
                 st.error("Please upload both Job Description and at least one Resume to proceed.")
     st.subheader("Filtered Results")
-    if st.session_state.data is None:
-        st.session_state.data = load_data()
-    df = st.session_state.data
+    df = load_data()
     if df is not None and not df.empty:
         with st.form("filter_form"):
             col1, col2, col3 = st.columns([1, 1, 1.5])
@@ -743,23 +1615,9 @@ elif st.session_state.page == "quick_analysis":
             )
             submit_button = st.form_submit_button("Show Results")
         if submit_button:
-            df = load_data()
-            df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-            if 'date_added' in df.columns:
-                df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
-                filtered_df = df[
-                    (df['date_added'].dt.date >= start_date) &
-                    (df['date_added'].dt.date <= end_date)
-                ]
-            else:
-                filtered_df = df
-            if subject_filter:
-                filtered_df = filtered_df[filtered_df['job_title'].str.contains(subject_filter, case=False, na=False)]
-            if status_filter != "All":
-                filtered_df = filtered_df[filtered_df['status'] == status_filter]
-            if top_scorers_filter != "All":
-                n = int(top_scorers_filter.split()[1])
-                filtered_df = filtered_df.sort_values('score', ascending=False).head(n)
+            st.session_state.quick_filters = (start_date, end_date, subject_filter, status_filter, top_scorers_filter)
+        if st.session_state.get("quick_filters"):
+            filtered_df = load_data(st.session_state.quick_filters)
             mcol1, mcol2, mcol3 = st.columns(3)
             with mcol1:
                 st.metric("Total Resumes", len(filtered_df))
@@ -797,19 +1655,12 @@ elif st.session_state.page == "quick_analysis":
                         col1, col2 = st.columns([1, 3])
                         col1.markdown('<span class="label">Job Title</span>', unsafe_allow_html=True)
                         col2.markdown(f'<span class="value">{row["job_title"]}</span>', unsafe_allow_html=True)
-                        resume_path = row.get('resume_path', None)
-                        if resume_path and os.path.exists(resume_path):
-                            with open(resume_path, "rb") as file:
-                                st.download_button(
-                                    label="📄 Download Resume",
-                                    data=file,
-                                    file_name=os.path.basename(resume_path),
-                                    mime="application/octet-stream",
-                                    key=f"download_resume_quick_{index}"
-                                )
-                        else:
-                            st.error("Resume file not found or path missing in database.")
+                        col1, col2 = st.columns([1, 3])
+                        col1.markdown('<span class="label">Scored By</span>', unsafe_allow_html=True)
+                        col2.markdown(f'<span class="value">{row.get("scoring_backend") or DEFAULT_SCORING_BACKEND}</span>', unsafe_allow_html=True)
+                        resume_download_button(row.get('resume_path', None), f"download_resume_quick_{index}")
             else:
                 st.info("No results found matching the filters.")
+        bulk_export_section("analysis2", start_date, end_date, subject_filter, status_filter, top_scorers_filter, "quick_export")
     else:
         st.info("No data available. Please process resumes to view results.")
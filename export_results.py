@@ -0,0 +1,179 @@
+"""Streaming export of analysis results and resume bundles.
+
+Results are read from SQLite in chunks and written incrementally, so memory stays flat
+regardless of how many candidates match. Used by the Streamlit app and runnable on its own:
+
+    python export_results.py --format csv --output shortlisted.csv --status Shortlisted --resumes-zip resumes.zip
+"""
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+import zipfile
+from contextlib import closing
+
+import pandas as pd
+
+DEFAULT_DATABASE = "/tmp/recruitment.db"
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FORMATS = ["csv", "parquet", "xlsx"]
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+}
+RESULT_TABLES = ("analysis", "analysis2")
+
+
+def build_results_query(table="analysis", start_date=None, end_date=None, job_title="", status="All", top_n=None):
+    if table not in RESULT_TABLES:
+        raise ValueError(f"Unknown results table: {table}")
+    clauses = []
+    params = []
+    if start_date:
+        clauses.append("date_added >= ?")
+        params.append(str(start_date))
+    if end_date:
+        clauses.append("date_added <= ?")
+        params.append(str(end_date))
+    if job_title:
+        clauses.append("job_title LIKE ?")
+        params.append(f"%{job_title}%")
+    if status and status != "All":
+        clauses.append("status = ?")
+        params.append(status)
+    query = f"SELECT * FROM {table}"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    if top_n:
+        query += " ORDER BY score DESC LIMIT ?"
+        params.append(int(top_n))
+    else:
+        query += " ORDER BY id DESC"
+    return query, params
+
+
+def iter_result_chunks(database=DEFAULT_DATABASE, chunksize=EXPORT_CHUNK_SIZE, **filters):
+    query, params = build_results_query(**filters)
+    with closing(sqlite3.connect(database)) as conn:
+        for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+            yield chunk.loc[:, ~chunk.columns.str.contains('^Unnamed')]
+
+
+def iter_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def write_csv(chunks, out):
+    for piece in iter_csv(chunks):
+        out.write(piece)
+
+
+def write_parquet(chunks, out):
+    import pyarrow as pa  # Requires pyarrow: pip install pyarrow
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                # Columns that are entirely NULL in the first chunk would otherwise be typed as null
+                schema = pa.schema([
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ])
+                writer = pq.ParquetWriter(out, schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is None:
+            pq.write_table(pa.table({}), out)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_xlsx(chunks, out):
+    from openpyxl import Workbook  # Requires openpyxl: pip install openpyxl
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    header = True
+    for chunk in chunks:
+        if header:
+            sheet.append(list(chunk.columns))
+            header = False
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False):
+            sheet.append(list(row))
+    workbook.save(out)
+
+
+EXPORT_WRITERS = {"csv": write_csv, "parquet": write_parquet, "xlsx": write_xlsx}
+
+
+def export_results(out, fmt="csv", database=DEFAULT_DATABASE, **filters):
+    if fmt not in EXPORT_WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    EXPORT_WRITERS[fmt](iter_result_chunks(database, **filters), out)
+
+
+def local_resume_path(resume_path):
+    return resume_path if resume_path and os.path.exists(resume_path) else None
+
+
+def write_resume_zip(out, database=DEFAULT_DATABASE, resolve_path=local_resume_path, **filters):
+    # Files are streamed into the archive one at a time; returns how many were added
+    added = 0
+    seen = set()
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for chunk in iter_result_chunks(database, **filters):
+            for row_id, name, resume_path in zip(chunk["id"], chunk["name"], chunk["resume_path"]):
+                if not resume_path or resume_path in seen:
+                    continue
+                seen.add(resume_path)
+                local_path = resolve_path(resume_path)
+                if not local_path:
+                    continue
+                safe_name = re.sub(r'\W+', '_', str(name)).strip('_') or "candidate"
+                arcname = f"{row_id}_{safe_name}{os.path.splitext(local_path)[1]}"
+                archive.write(local_path, arcname)
+                added += 1
+    return added
+
+
+def parse_date(value):
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export recruitment analysis results.")
+    parser.add_argument("--database", default=DEFAULT_DATABASE)
+    parser.add_argument("--table", choices=RESULT_TABLES, default="analysis",
+                        help="analysis for Gmail processing, analysis2 for Quick Analysis")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--start-date", type=parse_date)
+    parser.add_argument("--end-date", type=parse_date)
+    parser.add_argument("--job-title", default="")
+    parser.add_argument("--status", default="All", choices=["All", "Shortlisted", "Rejected"])
+    parser.add_argument("--top", type=int, help="Only export the N highest scores")
+    parser.add_argument("--resumes-zip", help="Also write a ZIP of the matching resume files")
+    args = parser.parse_args(argv)
+    filters = dict(
+        table=args.table, start_date=args.start_date, end_date=args.end_date,
+        job_title=args.job_title, status=args.status, top_n=args.top
+    )
+    with open(args.output, "wb") as out:
+        export_results(out, args.format, args.database, **filters)
+    print(f"Wrote {args.output}")
+    if args.resumes_zip:
+        with open(args.resumes_zip, "wb") as out:
+            added = write_resume_zip(out, args.database, **filters)
+        print(f"Wrote {added} resume(s) to {args.resumes_zip}")
+
+
+if __name__ == "__main__":
+    main()